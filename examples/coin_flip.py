@@ -12,10 +12,10 @@ class CoinToss(StateMachine):
     tails_to_heads = tails.to(heads, cond="is_tails")
 
     def is_heads(self):
-        return self.state == self.heads
+        return self.state is self.heads
 
     def is_tails(self):
-        return self.state == self.tails
+        return self.state is self.tails
 
     def on_enter_heads(self):
         print('Heads!')
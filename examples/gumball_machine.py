@@ -10,26 +10,40 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
-COIN_SLOT_OCCUPIED = "coin_inserted"
-COIN_SLOT_BAD = "coin_bad"
-COIN_SLOT_EMPTY = "empty"
+# Coin-slot states are small ints: the guard functions run on every
+# cycle(), and an int compare is cheaper than a string compare there
+COIN_SLOT_EMPTY, COIN_SLOT_OCCUPIED, COIN_SLOT_BAD = range(3)
+
+# Command opcodes for the hardware API; negative, so they can never be
+# mistaken for one of the slot states above
+CMD_READ = -1
+CMD_POSITION = -1
+
+# LED opcodes
+LED_OFF, LED_ON, LED_BLINK = range(3)
+LED_GREEN, LED_RED = range(2)
 
 
 class GumballMachineHardware:
     def __init__(self):
         self._hardware = Box(
-            coin_slot=False,
+            coin_slot=COIN_SLOT_EMPTY,
             speaker_play=self.play_sound,
             crank_position=0,
             leds=lambda *args: logger.info("LEDs play: %s", str(args))
 
         )
 
+    def reset(self):
+        # Return the mock hardware to its power-on state
+        self._hardware.coin_slot = COIN_SLOT_EMPTY
+        self._hardware.crank_position = 0
+
     def play_sound(self, sound_file):
         logger.info("Speaker plays %s", sound_file)
 
     def coin_slot(self, action):
-        if action == "read":
+        if action == CMD_READ:
             return self._hardware.coin_slot
         else:
             self._hardware.coin_slot = action
@@ -38,7 +52,7 @@ class GumballMachineHardware:
         self._hardware.leds(action, color)
 
     def crank(self, command):
-        if command == 'position':
+        if command == CMD_POSITION:
             return self._hardware.crank_position
 
     def turn_crank(self, degrees):
@@ -89,21 +103,21 @@ class GumballStateMachine(StateMachine):
         desc='The crank has been returned to its original position')
 
     def is_coin_inserted(self, event):
-        return self._model.coin_slot("read") == COIN_SLOT_OCCUPIED
+        return self._model.coin_slot(CMD_READ) == COIN_SLOT_OCCUPIED
 
     def is_coin_recognized(self, event):
-        return self._model.coin_slot("read") == COIN_SLOT_BAD
+        return self._model.coin_slot(CMD_READ) == COIN_SLOT_BAD
 
     def is_coin_returned(self, event):
-        return self._model.coin_slot("read") is COIN_SLOT_EMPTY
+        return self._model.coin_slot(CMD_READ) == COIN_SLOT_EMPTY
 
     def on_paying(self, event):
         logger.info("Coin being inserted")
-        self._model.leds("blink", "green")
+        self._model.leds(LED_BLINK, LED_GREEN)
         self._model.sound_play("coin_inserted")
 
     def is_crank_turning(self, event):
-        return self._model.crank("position") != 0
+        return self._model.crank(CMD_POSITION) != 0
 
     def on_dispensing(self, event):
         self._model.sound_play("kerplunk_gumball_dispensed")
@@ -115,8 +129,8 @@ class GumballStateMachine(StateMachine):
         return self._model.gumball_dispensed() is True
 
     def is_crank_returned(self, event):
-        return self._model.crank("position") == 0
+        return self._model.crank(CMD_POSITION) == 0
 
     def on_finishing(self, event):
-        self._model.leds("off", "green")
+        self._model.leds(LED_OFF, LED_GREEN)
         self._model.sound_play("crank_returned")
@@ -3,15 +3,15 @@
 import argparse
 import ast
 import sys
-from collections import defaultdict as dd
+from collections import deque
 from enum import Enum
 from importlib import import_module
 import os
-from typing import Text, List, Type, Set, Tuple
+from typing import Dict, Text, List, Type, Set, Tuple
 
 import plantuml
 
-from lean import StateMachine, State
+from lean import StateMachine, State, Transition
 
 
 DEFAULT_PLANTUML_SERVER = 'http://www.plantuml.com/plantuml/img/'
@@ -75,42 +75,65 @@ def get_args(argv: List[str]) -> Tuple[argparse.Namespace,
 def get_machine_ast(source_path, machine_name) -> ast.ClassDef:
     with open(source_path, "r") as f:
         tree = ast.parse(f.read())
-    for node in tree.body:
-        if isinstance(node, ast.ClassDef):
-            bases = getattr(node, 'bases', [])
-            for base in bases:
-                if (getattr(base, 'id', None) == 'StateMachine' and
-                        node.name == machine_name):
-                    return node
 
+    # Cheapest test first: most top-level nodes aren't ClassDefs, and of
+    # those that are, the name compare rejects before touching bases
+    return next(
+        (node for node in tree.body
+         if isinstance(node, ast.ClassDef) and node.name == machine_name
+         and any(getattr(base, 'id', None) == 'StateMachine'
+                 for base in node.bases)),
+        None)
 
-def get_method_body(klass: ast.ClassDef, method_name: Text) -> Text:
-    for node in klass.body:
-        if isinstance(node, ast.FunctionDef) and node.name == method_name:
-            return ast.unparse(node.body).replace('\n', '\\n')
+
+def get_machine_methods(klass: ast.ClassDef) -> Dict[Text, ast.FunctionDef]:
+    # Index the class's methods once, rather than re-scanning the class
+    # body for every transition's condition function
+    return {node.name: node
+            for node in klass.body if isinstance(node, ast.FunctionDef)}
+
+
+def get_method_body(methods: Dict[Text, ast.FunctionDef],
+                    method_name: Text) -> Text:
+    if node := methods.get(method_name):
+        return ast.unparse(node.body).replace('\n', '\\n')
 
 
 def walk_transition_graph(state: State,
-                          transitions: dd[State, Set],
+                          transitions: Dict[State, Tuple[Transition, ...]],
                           buf: List[Text],
                           pairs_visited: set,
-                          mach_ast: ast.ClassDef) -> None:
-
-    for trans in transitions.get(state, set()):
-        if (state, trans.state2) in pairs_visited:
-            continue
-        tbody = get_method_body(mach_ast, trans.cond)
-        buf.append(f"state {state.name} as \"{state.name}\"")
-        buf.append(f"state {trans.state2.name} as \"{trans.state2.name}\"")
-        buf.append(f"{state.name} --> {trans.state2.name} : "
-                   f"{trans.name}:\\n  {tbody}")
-        pairs_visited.add((state, trans.state2))
-        if not trans.state2.final:
-            walk_transition_graph(trans.state2,
-                                  transitions,
-                                  buf,
-                                  pairs_visited,
-                                  mach_ast)
+                          declared_states: Set[Text],
+                          methods: Dict[Text, ast.FunctionDef]) -> None:
+
+    # Iterative worklist rather than recursion, so wide or deep machines
+    # can't hit the interpreter's recursion limit.  Visited edges are
+    # keyed on object ids to skip hashing the State instances themselves
+    todo = deque([state])
+    while todo:
+        state = todo.popleft()
+        for trans in transitions.get(state, ()):
+            key = (id(state), id(trans.state2))
+            if key in pairs_visited:
+                continue
+            # cond may be declared as a name or as the function itself
+            cond_name = (trans.cond if isinstance(trans.cond, str)
+                         else trans.cond.__name__)
+            tbody = get_method_body(methods, cond_name)
+
+            # Declare each state only once - repeat declarations just
+            # bloat the markup
+            lines = []
+            for decl in (state, trans.state2):
+                if decl.name not in declared_states:
+                    declared_states.add(decl.name)
+                    lines.append(f"state {decl.name} as \"{decl.name}\"")
+            lines.append(f"{state.name} --> {trans.state2.name} : "
+                         f"{trans.name}:\\n  {tbody}")
+            buf.extend(lines)
+            pairs_visited.add(key)
+            if not trans.state2.final:
+                todo.append(trans.state2)
 
 
 def machine2plantuml(source_path: Text,
@@ -122,6 +145,7 @@ def machine2plantuml(source_path: Text,
 
     # Get the state machine's AST, so we can extract logic from event handlers
     mach_ast = get_machine_ast(source_path, machine_class)
+    methods = get_machine_methods(mach_ast)
 
     # static initialize the state machine
     machine.callbacks_init()
@@ -142,10 +166,16 @@ def machine2plantuml(source_path: Text,
            f"state {state_initial.name}",
            f"[*] --> {state_initial.name}"]
     pairs_visited = set()
+    declared_states = {state_initial.name}
     for state in transitions.keys():
-        walk_transition_graph(state, transitions, buf, pairs_visited, mach_ast)
+        walk_transition_graph(state, transitions, buf, pairs_visited,
+                              declared_states, methods)
     if state_final:
-        buf.append(f"state {state_final.name}")
+        # The walker usually declared the final state already - only
+        # declare it here if no transition ever reached it
+        if state_final.name not in declared_states:
+            declared_states.add(state_final.name)
+            buf.append(f"state {state_final.name}")
         buf.append(f"{state_final.name} --> {state_initial.name}")
         buf.append(f"{state_final.name} --> [*]")
     buf.append("@enduml")
@@ -1,28 +1,65 @@
-from collections import defaultdict as dd
-from functools import partial
 import logging
+import sys
+from dataclasses import dataclass, field
 from threading import Lock
-from typing import Callable, Text, Union, Any, Set
+from typing import Callable, Dict, Text, Tuple, Union, Any, Set
 
 
-GLOBAL_LOGGING_LEVEL = logging.INFO
-logging.basicConfig(level=GLOBAL_LOGGING_LEVEL)
+# No basicConfig here: a library must not install handlers or set
+# levels on the root logger - that's the application's call
 logger = logging.getLogger(__name__)
 
-mutex = Lock()
+# Event-callback name prefixes, in transition firing order
+_EVENT_PREFIXES = ("before_", "on_exit_", "on_", "after_", "on_enter_")
 
+# Free-threaded builds (PEP 703) expose sys._is_gil_enabled; on a
+# conventional build the GIL already serializes the init handshake and
+# the per-class lock is pure overhead
+_GIL_ENABLED = (sys._is_gil_enabled()
+                if hasattr(sys, "_is_gil_enabled") else True)
 
-class State(object):
-    def __init__(self,
-                 name: Text,
-                 desc: Text = None,
-                 initial: bool = False,
-                 final: bool = False
-                 ):
-        self._name = name
-        self._desc = desc
-        self._initial = initial
-        self._final = final
+
+# eq=False on both dataclasses is deliberate: States and Transitions
+# are declared once at class-body level and never copied, so they keep
+# object-identity __eq__/__hash__ and stay safe as dict keys; a
+# field-comparing __eq__ would be slower and wrong for singletons
+@dataclass(slots=True, eq=False, repr=False)
+class State:
+    """
+    A named state belonging to a StateMachine subclass.
+
+    States are declared once at class-body level and never copied, so
+    they are singletons: compare them with 'is', not '=='.  A State may
+    be shared by several machines (via subclassing), so it carries no
+    per-machine data; each StateMachine subclass assigns its own
+    small-int ids in its _state_ids mapping, and the hot paths in
+    cycle() rely on identity tests and those ids.
+
+    :param name: Name of the state
+    :param desc: Human-readable description
+    :param initial: Whether the machine starts in this state
+    :param final: Whether the machine halts in this state
+    """
+
+    name: Text
+    desc: Text = None
+    initial: bool = False
+    final: bool = False
+
+    # Precomputed "is_<name>" key for StateMachine.__getitem__, so
+    # queries don't rebuild the string on every call
+    _is_name: Text = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        # Interned: state names recur as substrings of handler keys and
+        # as dict keys in per-class tables, so one shared copy keeps
+        # those lookups on the cached-hash/pointer-compare fast path.
+        # The is_ key is interned too, so a caller passing the same
+        # interned key compares by pointer
+        self.name = sys.intern(self.name)
+        self._is_name = sys.intern(f"is_{self.name}")
+        if self.desc is None:
+            self.desc = f"[{self.name}]"
 
     def to(self,
            to_state: "State",
@@ -36,31 +73,16 @@ class State(object):
                           state1=self, state2=to_state,
                           cond=cond)
 
-    @property
-    def name(self) -> Text:
-        return self._name
-
-    @property
-    def desc(self) -> Text:
-        return self._desc or f"[{self._name}]"
-
-    @property
-    def initial(self) -> bool:
-        return self._initial
-
-    @property
-    def final(self) -> bool:
-        return self._final
-
     def __str__(self):
-        return (f"State({self._name}: "
-                f"initial={getattr(self, 'initial', None)}, "
-                f"final={getattr(self, 'final', None)})")
+        return (f"State({self.name}: "
+                f"initial={self.initial}, "
+                f"final={self.final})")
 
     __repr__ = __str__
 
 
-class Transition(object):
+@dataclass(slots=True, eq=False, repr=False)
+class Transition:
     """
     Transition between two states, qualified by a condition function
     There may be more than one next state, so it's up to your condition
@@ -72,56 +94,60 @@ class Transition(object):
     :param cond: Condition under which the transition is valid
     """
 
-    def __init__(self,
-                 state1: State,
-                 state2: State,
-                 cond: Union[Text, Callable],
-                 name: Text = None,
-                 desc: Text = None
-                 ):
-        self._name = name
-        self._state1 = state1
-        self._state2 = state2
-        self._desc = desc
-        self._cond = cond
+    state1: State
+    state2: State
+    cond: Union[Text, Callable]
+    name: Text = None
+    desc: Text = None
 
-    @property
-    def name(self) -> Text:
-        return self._name
-
-    @name.setter
-    def name(self, name):
-        self._name = name
-
-    @property
-    def desc(self) -> Text:
-        return self._desc or f"[{self._name}]"
-
-    @property
-    def state1(self) -> State:
-        return self._state1
-
-    @property
-    def state2(self) -> State:
-        return self._state2
-
-    @property
-    def cond(self) -> Union[Text, Callable]:
-        return self._cond
+    # Resolved by StateMachine.callbacks_init once the owning class
+    # is known
+    _cond_fn: Callable = field(default=None, init=False, repr=False)
+    callbacks: Tuple = field(default=(), init=False, repr=False)
+    _run_callbacks: Callable = field(default=None, init=False, repr=False)
 
     def __str__(self) -> str:
-        return (f"Transition({self._name}, "
-                f"from:{self._state1}, "
-                f"to:{self._state2}, "
-                f"cond={self._cond}")
+        return (f"Transition({self.name}, "
+                f"from:{self.state1}, "
+                f"to:{self.state2}, "
+                f"cond={self.cond}")
 
     __repr__ = __str__
 
 
 class StateMachine(object):
-    _states = set()
-    _transitions = dd(list)
+    # Instance storage is slotted to drop the per-instance __dict__ for
+    # the many-machines use case.  Subclasses that don't declare their
+    # own __slots__ still get a __dict__ for any extra attributes
+    __slots__ = ('_state', '_name', '_desc', '_model')
+
+    # Pre-init defaults only; callbacks_init assigns each subclass its
+    # own containers, so distinct machines never share mutable state.
+    # states and transitions are the public views - plain class
+    # attributes, not classmethod-property stacks, which are deprecated
+    # as of Python 3.11 and cost two descriptor hops per read
+    _states = frozenset()
+    _transitions = {}
     _initial_state = None
+    states: Set[State] = frozenset()
+    transitions: Dict[State, Tuple[Transition, ...]] = {}
+
+    # Ready sentinel: flipped True as the very last step of
+    # callbacks_init, so a partially-initialized class (e.g. one whose
+    # validation raised) never looks ready
+    _initialized = False
+    _init_lock = Lock()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        # Each subclass owns its init lifecycle; without this a subclass
+        # of an already-initialized machine would inherit
+        # _initialized=True and skip building its own tables.  The lock
+        # is per-class too, so first-touch initialization of unrelated
+        # machines on different threads never contends
+        cls._initialized = False
+        cls._init_lock = Lock()
 
     def __init__(self,
                  name: Text,
@@ -135,37 +161,30 @@ class StateMachine(object):
         self._desc = desc
         self._model = model
 
-        self._first_run = True
-        try:
-            # Perform once-only static initialization for the given subclass
-            if mutex.acquire(blocking=True):
-                klass = self.__class__
-                if not klass.is_initialized:
-                    klass.callbacks_init()
-        finally:
-            mutex.release()
+        # Perform once-only static initialization for the given subclass.
+        # Double-checked locking: the common case (already initialized) is
+        # one C-level dict lookup with no lock traffic at all.  Reading
+        # the class's own dict (not the inherited attribute) skips the
+        # descriptor protocol and can never be fooled by a ready parent
+        klass = self.__class__
+        if not klass.__dict__.get('_initialized', False):
+            if _GIL_ENABLED:
+                # Worst case two racing threads both rebuild the tables;
+                # callbacks_init publishes complete containers and flips
+                # the flag last, so the duplicate work is wasted, not
+                # wrong - cheaper than taking a lock on every first touch
+                klass.callbacks_init()
+            else:
+                with klass._init_lock:
+                    if not klass.__dict__.get('_initialized', False):
+                        klass.callbacks_init()
         self._state = self._initial_state
 
-    @classmethod
-    @property
-    def is_initialized(cls) -> bool:
-        return getattr(cls, "_initial_state", None) is not None
-
     @property
     def state(self) -> State:
         # There is only one state at a time
         return self._state
 
-    @classmethod
-    @property
-    def states(cls) -> Set[State]:
-        return cls._states
-
-    @classmethod
-    @property
-    def transitions(cls) -> dd[State, Set]:
-        return cls._transitions
-
     @classmethod
     def callbacks_init(cls):
         # Build indexes for state and transition callbacks
@@ -174,129 +193,391 @@ class StateMachine(object):
         # This distinction is important, because multiple instances of the same
         # StateMachine subclass will share the same callback methods, and this
         # ensures that we always provide the correct instance passed as 'self'.
-        cls._initial_state = None
-        members = cls.__dict__.keys()
-        final_states = 0
-
-        # just in case we're re-initializing, we don't want these class props
-        # to pile up with dupes
-        cls._states.clear()
-        cls._transitions.clear()
-
-        for name in filter(lambda n: not n.startswith('_'), members):
-            attrib = getattr(cls, name)
-
+        # Everything is accumulated in locals and published onto the
+        # class only at the end: a concurrent or repeated call can then
+        # never expose half-built state - re-entry just rebuilds the
+        # same tables.  The lock-free GIL fast path in __init__ depends
+        # on this
+        initial_state = None
+        states = set()
+
+        # Per-class small-int ids in declaration order.  Ids live in
+        # this mapping, never on the State objects themselves - a State
+        # can be shared with a parent machine whose published tables
+        # must not be renumbered by a subclass's init
+        state_ids = {}
+        initial_states = 0
+
+        # Accumulate transitions locally; frozen to tuples below so the
+        # published mapping can't grow phantom entries the way the old
+        # class-level defaultdict could
+        transitions = {}
+        transition_ids = set()
+
+        # Walk the MRO's class dicts directly; this skips the getattr
+        # descriptor dispatch per name, and filters to the State and
+        # Transition members we actually care about
+        members = []
+        handlers = {}
+        seen = set()
+        for base in cls.__mro__:
+            for name, attrib in base.__dict__.items():
+                if name.startswith('_') or name in seen:
+                    continue
+                seen.add(name)
+                if isinstance(attrib, (State, Transition)):
+                    members.append((name, attrib))
+                elif callable(attrib) and name.startswith(_EVENT_PREFIXES):
+                    # Candidate event callback; the dict makes resolving
+                    # each transition's five callback names a plain
+                    # lookup instead of a getattr MRO walk
+                    handlers[name] = attrib
+
+        for name, attrib in members:
             if isinstance(attrib, State):
+                state_ids[attrib] = len(states)
                 if attrib.initial:
-                    if cls._initial_state:
-                        raise StateException(
-                            "Only one initial state per machine is permitted")
-                    cls._initial_state = attrib
-                if attrib.final:
-                    final_states += 1
+                    initial_states += 1
+                    initial_state = attrib
                 if not attrib.name:
-                    raise StateException("State must have a name")
-                cls._states.add(attrib)
+                    raise StateException("State must have a name",
+                                         code="NO_NAME")
+                states.add(attrib)
 
             elif isinstance(attrib, Transition):
                 if not attrib.name:
                     attrib.name = name
-                if ((cond_name := getattr(attrib, 'cond')) is None or
-                        getattr(cls, cond_name, None) is None):
+
+                # Same interning policy as State names: one shared copy
+                # per name keeps later compares and dict lookups on the
+                # pointer fast path
+                attrib.name = sys.intern(attrib.name)
+                if attrib.desc is None:
+                    attrib.desc = f"[{attrib.name}]"
+                # A cond may be the function itself (declared above the
+                # transition in the class body) - nothing to resolve -
+                # or a name, resolved here once so cycle() need not
+                # repeat the lookup on every tick
+                if callable(cond := attrib.cond):
+                    attrib._cond_fn = cond
+                elif cond is None or getattr(cls, cond, None) is None:
                     raise TransitionException(
                         f"Transition {attrib.name} has no 'cond' param, or "
                         f"condition method "
-                        f"'{cls.__name__}.{cond_name}' needs implementing")
-                if attrib in cls._transitions[attrib.state1]:
+                        f"'{cls.__name__}.{cond}' needs implementing",
+                        code="NO_COND")
+                else:
+                    attrib.cond = sys.intern(cond)
+                    attrib._cond_fn = getattr(cls, attrib.cond)
+                if id(attrib) in transition_ids:
                     raise TransitionException(
                         f"Duplicate transition {attrib.name} from "
-                        f"{attrib.state1} to {attrib.state2}")
-                cls._transitions[attrib.state1].append(attrib)
-
-                # Collect callbacks as partials, in proper firing order.
-                # At runtime the 'self' param is added for correct context
+                        f"{attrib.state1} to {attrib.state2}",
+                        code="DUP_TRANS")
+                transition_ids.add(id(attrib))
+                transitions.setdefault(attrib.state1, []).append(attrib)
+
+                # Collect callbacks as (function, event) pairs, in proper
+                # firing order.  Note that we store the method function refs,
+                # not bound methods, so 'self' is supplied at call time
                 callbacks = []
-                setattr(attrib, 'callbacks', callbacks)
-                for event_type, actor in [("before", attrib),
-                                          ("on_exit", attrib.state1),
-                                          ("on", attrib),
-                                          ("after", attrib),
-                                          ("on_enter", attrib.state2)]:
-                    if event_callback := getattr(
-                            cls, f"{event_type}_{actor.name}", None):
-                        callbacks.append(partial(event_callback, event=actor))
-
-        if not cls._initial_state:
-            raise StateException("One initial state must be defined")
-        if not cls._transitions:
-            raise TransitionException("No transitions defined")
+                for event_type, actor in zip(_EVENT_PREFIXES,
+                                             (attrib, attrib.state1, attrib,
+                                              attrib, attrib.state2)):
+                    if event_callback := handlers.get(
+                            sys.intern(event_type + actor.name)):
+                        callbacks.append((event_callback, actor))
+                attrib.callbacks = tuple(callbacks)
+                attrib._run_callbacks = cls._compile_callbacks(callbacks)
+
+        if initial_states == 0:
+            raise StateException("One initial state must be defined",
+                                 code="NO_INITIAL")
+        if initial_states > 1:
+            raise StateException(
+                "Only one initial state per machine is permitted",
+                code="PLURAL_INITIAL")
+        if not transitions:
+            raise TransitionException("No transitions defined",
+                                      code="NO_TRANS")
+        transitions_map = {
+            state: tuple(trans) for state, trans in transitions.items()}
+
+        # States in id order - the row index for every by-id table, and
+        # the way an integer state id maps back to its State object
+        states_by_id = tuple(sorted(states, key=state_ids.__getitem__))
+
+        # Flat dispatch table: state id -> ordered tuple of outgoing
+        # transitions.  cycle() indexes this directly instead of hashing
+        # State objects through a dict lookup
+        transitions_by_id = tuple(
+            transitions_map.get(state, ()) for state in states_by_id)
+
+        # Transition metadata in structure-of-arrays form: one flat
+        # tuple per field, indexed by transition number, plus a
+        # per-state tuple of the indexes of its outgoing transitions.
+        # The interpreter loop reads three parallel slots per candidate
+        # instead of chasing attributes through each Transition object
+        flat = [trans
+                for candidates in transitions_by_id
+                for trans in candidates]
+        edges, next_idx = [], 0
+        for candidates in transitions_by_id:
+            edges.append(tuple(range(next_idx,
+                                     next_idx + len(candidates))))
+            next_idx += len(candidates)
+
+        # Publish: immutable containers make the once-built contract
+        # explicit, and nothing above mutated class state, so a racing
+        # thread sees either the old tables or the finished new ones
+        cls._initial_state = initial_state
+        cls._states = frozenset(states)
+        cls._state_ids = state_ids
+        cls._transitions = transitions_map
+        cls._states_by_id = states_by_id
+        cls._transitions_by_id = transitions_by_id
+        cls._tr_trans = tuple(flat)
+        cls._tr_cond = tuple(trans._cond_fn for trans in flat)
+        cls._tr_run = tuple(trans._run_callbacks for trans in flat)
+        cls._tr_target = tuple(trans.state2 for trans in flat)
+        cls._state_edges = tuple(edges)
+
+        # Final states as a bitmask over state ids - one int test in
+        # cycle() instead of an attribute load per tick
+        cls._final_mask = sum(
+            1 << state_ids[state] for state in states if state.final)
+
+        # Public views, then the specialized cycle() for this subclass
+        cls.states = cls._states
+        cls.transitions = cls._transitions
+        cls._compile_cycle()
+        cls._initialized = True
+
+    @staticmethod
+    def _compile_callbacks(callbacks: list) -> Callable:
+        # Compile a transition's callback chain into one straight-line
+        # function, so cycle() makes a single call per transition rather
+        # than looping over a list of partials.  The callbacks and their
+        # event objects are bound as default args - LOAD_FAST at call time
+        params, body = [], []
+        for idx, (event_callback, actor) in enumerate(callbacks):
+            params.append(f"_cb{idx}=_cb{idx}, _e{idx}=_e{idx}")
+            # Positional call - binding event by keyword would force a
+            # kwargs dict build on every invocation
+            body.append(f"    _cb{idx}(self, _e{idx})")
+        src = (f"def _run(self, {', '.join(params)}):\n" if params
+               else "def _run(self):\n")
+        src += "\n".join(body) if body else "    pass"
+        namespace = {}
+        for idx, (event_callback, actor) in enumerate(callbacks):
+            namespace[f"_cb{idx}"] = event_callback
+            namespace[f"_e{idx}"] = actor
+        exec(src, namespace)
+        return namespace["_run"]
+
+    @classmethod
+    def _compile_cycle(cls):
+        # Generate a cycle() specialized to this subclass's transition
+        # graph.  The generic interpreter below walks dispatch tables on
+        # every tick; here the graph is fixed at class-init time, so we
+        # unroll it into straight-line code - an identity test per state,
+        # a direct call per condition, with next-states bound as locals
+        lines = ["def cycle(self):",
+                 "    state = self._state"]
+        namespace = {}
+        branch = "if"
+        tag = 0
+        for state_id, state in enumerate(cls._states_by_id):
+            namespace[f"_s{state_id}"] = state
+            lines.append(f"    {branch} state is _s{state_id}:")
+            branch = "elif"
+            if cls._final_mask & (1 << state_id):
+                lines.append("        return False")
+                continue
+            candidates = cls._transitions_by_id[state_id]
+            if not candidates:
+                lines.append("        return self._no_transitions()")
+                continue
+            for trans in candidates:
+                tag += 1
+                namespace[f"_c{tag}"] = trans._cond_fn
+                namespace[f"_t{tag}"] = trans
+                namespace[f"_r{tag}"] = trans._run_callbacks
+                namespace[f"_n{tag}"] = trans.state2
+                lines.append(f"        if _c{tag}(self, _t{tag}):")
+                lines.append(f"            _r{tag}(self)")
+                lines.append(f"            self._state = _n{tag}")
+                lines.append("            return True")
+            lines.append("        self._warn_no_transition()")
+            lines.append("        return False")
+
+        # Fallback for a state outside the branch chain (e.g. a caller
+        # poking _state directly); mirrors the interpreter's contract of
+        # False whenever no transition fired
+        lines.append("    return False")
+
+        # Don't clobber a cycle() the class defines itself - such a
+        # class keeps its override, which may delegate to the generic
+        # interpreter loop below via super()
+        if 'cycle' not in cls.__dict__:
+            exec("\n".join(lines), namespace)
+            cls.cycle = namespace["cycle"]
+
+    @classmethod
+    def compile_event_table(cls):
+        """
+        Build an integer next-state table for bulk simulation.
+
+        Each transition's condition name is treated as an event label and
+        assigned a column; rows are state ids.  An entry holds the next
+        state id when that event fires in that state, or the state's own
+        id when the event does not apply there.  Requires numpy.
+        """
+        try:
+            import numpy as np
+        except ImportError as exc:
+            raise StateMachineException(
+                "compile_event_table requires numpy to be installed",
+                code="NEEDS_NUMPY") from exc
+
+        if not cls._initialized:
+            cls.callbacks_init()
+
+        # Label columns by condition-function name, which covers both
+        # string and direct-callable cond declarations
+        event_ids = {}
+        for candidates in cls._transitions_by_id:
+            for trans in candidates:
+                event_ids.setdefault(trans._cond_fn.__name__, len(event_ids))
+
+        n_states = len(cls._states)
+        table = np.repeat(np.arange(n_states, dtype=np.int32)[:, None],
+                          len(event_ids), axis=1)
+        for state_id, candidates in enumerate(cls._transitions_by_id):
+            for trans in candidates:
+                table[state_id, event_ids[trans._cond_fn.__name__]] = \
+                    cls._state_ids[trans.state2]
+        cls._event_ids = event_ids
+        cls._event_table = table
+
+    @classmethod
+    def cycle_bulk(cls, state_ids, event_ids):
+        """
+        Advance many independent machines in one vectorized step.
+
+        Takes parallel integer arrays of current state ids and event ids
+        (columns from compile_event_table's _event_ids mapping) and
+        returns the array of next state ids.  Events are taken at face
+        value - condition functions and callbacks are not consulted, so
+        this is for bulk flow processing, not for machines whose
+        callbacks carry side effects.
+        """
+        # Own-dict lookup: a subclass must not silently reuse its
+        # parent's table, whose ids may not match its own
+        if cls.__dict__.get("_event_table") is None:
+            cls.compile_event_table()
+        return cls._event_table[state_ids, event_ids]
+
+    @classmethod
+    def compile_njit(cls):
+        """
+        Opt-in numba fast path over the integer event table.
+
+        Returns (and caches on the class) a jitted step(state_id,
+        event_id) -> next state id function, closed over the table from
+        compile_event_table plus a final-state vector so final states
+        stay put.  For pure event streams this turns the per-tick cost
+        into two array indexes of machine code.  Requires numba; like
+        numpy it is imported only when asked for.
+        """
+        # Own-dict lookup, as with the event table: a subclass must not
+        # inherit a kernel closed over its parent's table
+        if (step := cls.__dict__.get("_njit_step")) is not None:
+            return step
+        try:
+            from numba import njit
+        except ImportError as exc:
+            raise StateMachineException(
+                "compile_njit requires numba to be installed",
+                code="NEEDS_NUMBA") from exc
+        import numpy as np
+
+        if cls.__dict__.get("_event_table") is None:
+            cls.compile_event_table()
+        table = cls._event_table
+        finals = np.array(
+            [(cls._final_mask >> state_id) & 1
+             for state_id in range(len(cls._states))], dtype=np.int32)
+
+        # Note: numba cannot persist a disk cache for closures, so this
+        # compiles once per process on first call
+        @njit
+        def step(state_id, event_id):
+            if finals[state_id]:
+                return state_id
+            return table[state_id, event_id]
+
+        cls._njit_step = step
+        return step
+
+    def _no_transitions(self):
+        # A non-final state with no outgoing transitions is a dead end,
+        # but a benign one - the machine simply cannot advance.  Raising
+        # here would allocate an exception and capture a traceback for
+        # ordinary flow control, so report it like the final-state case
+        logger.debug("No transitions found from state: %s", self._state)
+        return False
+
+    def _warn_no_transition(self):
+        logger.warning(
+            "No transition or condition was found for state: "
+            "%s.  This is possibly due to the condition "
+            "function not correctly matching the current context.",
+            self._state)
 
     def cycle(self):
         klass = self.__class__
 
-        if self._first_run:
-            try:
-                if mutex.acquire(blocking=True):
-                    self._first_run = False
-                    if not getattr(self, '_state', None):
-                        raise StateMachineException(
-                            "State machine has no current state. Ensure that "
-                            "you called super().__init__(*args, **kwargs) "
-                            "from your subclass __init__ method.")
-
-                    if not klass.transitions:
-                        raise TransitionException(
-                            "No transitions were found, or your StateMachine "
-                            "subclass is not calling super().__init__(*args, "
-                            "**kwargs) from its own __init__ method.")
-            finally:
-                mutex.release()
-
-        if self._state.final:
+        # Localize the hot names once - LOAD_FAST in the loop below, not
+        # repeated attribute loads.  A subclass that skipped
+        # super().__init__ has no _state slot, so this read raises
+        # AttributeError - the invariants the old locked first-run block
+        # re-validated are all established at init time now
+        state = self._state
+        state_id = klass._state_ids[state]
+        if klass._final_mask & (1 << state_id):
             return False
 
-        # Get the transitions for the current state - there must be some,
-        # unless the current state is marked final
-        if not (candidates := klass.transitions.get(self._state, None)):
-            raise TransitionException(
-                f"No transitions found from state: {self._state}")
+        # Get the transitions for the current state; a dead-end state
+        # just reports no progress, like a final state does
+        if not (edges := klass._state_edges[state_id]):
+            return self._no_transitions()
 
         # Iterate the transitions from current state to other states
         # and check if their condition function matches current context
-        did_transition = False
-        for trans in candidates:
-            if condition_fn := getattr(klass, trans.cond, None):
-                if condition_fn(self, trans):
-                    # Entered a transition with matching condition..
-                    # Let's execute defined callbacks, with 'self' as context
-                    for callback in trans.callbacks:
-                        callback(self=self)
-
-                    # Move to the next state
-                    self._state = trans.state2
-                    did_transition = True
-
-                    # Transition complete - we do not look for other matching
-                    # transitions
-                    break
-            else:
-                raise TransitionException(
-                    f"Condition function {trans.cond} for transition "
-                    f"{str(trans)} is not yet implemented")
+        tr_cond, tr_trans = klass._tr_cond, klass._tr_trans
+        for idx in edges:
+            if tr_cond[idx](self, tr_trans[idx]):
+                # Entered a transition with matching condition..
+                # Let's execute defined callbacks, with 'self' as context
+                klass._tr_run[idx](self)
 
-        if not did_transition:
-            logger.warning(
-                "No transition or condition was found for state: "
-                "%s.  This is possibly due to the condition "
-                "function not correctly matching the current context.",
-                str(self._state))
+                # Move to the next state.  Transition complete - we do
+                # not look for other matching transitions
+                self._state = klass._tr_target[idx]
+                return True
+
+        self._warn_no_transition()
+        return False
 
     def __getitem__(self, item: Text, something=None) -> Any:
-        val = getattr(self, item, None)
-        logger.debug("StateMachine.__getitem__(%s): %s", item,
-                     str(val))
+        # Answer "is_<state>" queries first - they need no attribute
+        # lookup at all, just a compare against the precomputed key
         if item.startswith("is_"):
-            return item == f"is_{self._state.name}"
+            return item == self._state._is_name
+        val = getattr(self, item, None)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("StateMachine.__getitem__(%s): %s", item, val)
         return val
 
     def __str__(self) -> str:
@@ -305,13 +586,25 @@ class StateMachine(object):
     __repr__ = __str__
 
 
-class TransitionException(Exception):
+class LeanException(Exception):
+    """
+    Base for the library's exceptions.  Besides the human-readable
+    message, each carries a stable machine-readable code, so callers
+    and tests can match on the code instead of scanning message text.
+    """
+
+    def __init__(self, message: Text = "", code: Text = ""):
+        super().__init__(message)
+        self.code = code
+
+
+class TransitionException(LeanException):
     pass
 
 
-class StateException(Exception):
+class StateException(LeanException):
     pass
 
 
-class StateMachineException(Exception):
+class StateMachineException(LeanException):
     pass
@@ -0,0 +1,32 @@
+import pytest
+
+
+@pytest.fixture(scope="session")
+def gumball_cls():
+    # Hand tests the class through a fixture, so the machine's one-time
+    # validation and table construction happens at most once per
+    # session.  Imported lazily, so runs that deselect the gumball
+    # tests never execute the example module at all
+    from examples.gumball_machine import GumballStateMachine
+    return GumballStateMachine
+
+
+@pytest.fixture(scope="session")
+def _gumball_pair(gumball_cls):
+    from examples.gumball_machine import GumballMachineHardware
+    hw = GumballMachineHardware()
+    sm = gumball_cls(
+        name="Gumball state machine controller",
+        desc="Demo of a gumball machine controlled by lean-statemachine",
+        model=hw)
+    return sm, hw
+
+
+@pytest.fixture
+def gumball(_gumball_pair, gumball_cls):
+    # Per-test reset: re-arm the hardware and rewind the machine
+    # instead of reconstructing both
+    sm, hw = _gumball_pair
+    hw.reset()
+    sm._state = gumball_cls.ready
+    return sm, hw
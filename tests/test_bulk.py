@@ -0,0 +1,72 @@
+from lean import StateMachine, State
+
+import pytest
+
+
+np = pytest.importorskip("numpy")
+
+
+class ThreePhase(StateMachine):
+    state_a = State('state_a', initial=True)
+    state_b = State('state_b')
+    state_c = State('state_c', final=True)
+
+    state_a_to_b = state_a.to(state_b, cond="go_b")
+    state_b_to_c = state_b.to(state_c, cond="go_c")
+
+    def go_b(self, event):
+        return True
+
+    def go_c(self, event):
+        return True
+
+
+def _sid(state):
+    # A state's id in ThreePhase's per-class mapping
+    return ThreePhase._state_ids[state]
+
+
+def test_bulk_step():
+    ThreePhase.compile_event_table()
+    events = ThreePhase._event_ids
+
+    states = np.array([_sid(ThreePhase.state_a), _sid(ThreePhase.state_b)],
+                      dtype=np.int32)
+    fired = np.array([events["go_b"], events["go_c"]], dtype=np.int32)
+
+    next_states = ThreePhase.cycle_bulk(states, fired)
+    assert list(next_states) == [_sid(ThreePhase.state_b),
+                                 _sid(ThreePhase.state_c)]
+
+
+def test_bulk_unmatched_event_stays_put():
+    ThreePhase.compile_event_table()
+    events = ThreePhase._event_ids
+
+    # go_c does not apply in state_a, so the machine stays where it is
+    states = np.array([_sid(ThreePhase.state_a)], dtype=np.int32)
+    fired = np.array([events["go_c"]], dtype=np.int32)
+
+    next_states = ThreePhase.cycle_bulk(states, fired)
+    assert list(next_states) == [_sid(ThreePhase.state_a)]
+
+
+######################################################################
+
+
+def test_njit_step():
+    pytest.importorskip("numba")
+    step = ThreePhase.compile_njit()
+    events = ThreePhase._event_ids
+
+    state = _sid(ThreePhase.state_a)
+    state = step(state, events["go_b"])
+    assert state == _sid(ThreePhase.state_b)
+    state = step(state, events["go_c"])
+    assert state == _sid(ThreePhase.state_c)
+
+    # state_c is final - further events leave the machine where it is
+    assert step(state, events["go_b"]) == state
+
+
+######################################################################
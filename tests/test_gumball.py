@@ -1,61 +1,70 @@
-from unittest import TestCase
+import pytest
 
-from examples.gumball_machine import (
-    COIN_SLOT_OCCUPIED, GumballMachineHardware, GumballStateMachine)
 
+def _insert_coin(sm, hw):
+    # Common preamble: drop a coin and advance out of ready.  The
+    # import is deferred with the rest of the module's gumball imports;
+    # after the fixtures have run it is a cached-module lookup
+    from examples.gumball_machine import COIN_SLOT_OCCUPIED
+    hw.coin_slot(COIN_SLOT_OCCUPIED)
+    sm.cycle()
 
-class TestGumballStateMachine(TestCase):
-    def setUp(self):
-        # Get a gumball machine hardware API
-        self.gumball_hw = GumballMachineHardware()
 
-        # Create a gumball machine state machine with hardware API as context
-        self.gumball_sm = GumballStateMachine(
-            name="Gumball state machine controller",
-            desc="Demo of a gumball machine controlled by lean-statemachine",
-            model=self.gumball_hw)
+def test_ready(gumball, gumball_cls):
+    sm, hw = gumball
+    assert sm.state is gumball_cls.ready
 
-    def test_ready(self):
-        self.assertEqual(self.gumball_sm.state,
-                         GumballStateMachine.ready)
 
-    def test_coin_insert(self):
-        # the just-instantiated gumball machine should be in the ready state
-        self.assertEqual(self.gumball_sm.state,
-                         GumballStateMachine.ready)
+def test_coin_insert(gumball, gumball_cls):
+    sm, hw = gumball
 
-        # Simulate the user dropping a coin, by telling the gumball hardware
-        self.gumball_hw.coin_slot(COIN_SLOT_OCCUPIED)
+    # the just-instantiated gumball machine should be in the ready state
+    assert sm.state is gumball_cls.ready
 
-        # Cycle the state machine, causing it to check hardware API's new state
-        self.gumball_sm.cycle()
+    # Simulate the user dropping a coin, by telling the gumball hardware
+    _insert_coin(sm, hw)
 
-        # The
-        self.assertEqual(self.gumball_sm.state,
-                         GumballStateMachine.coin_dropped)
+    assert sm.state is gumball_cls.coin_dropped
 
-        # User turns the crank ...
-        for degree in (90, 180, 270, 360):
-            self.gumball_hw.turn_crank(degree)
-            self.gumball_sm.cycle()
 
-            # check that the gumball has NOT dropped
-            if degree < 360:
-                self.assertEqual(self.gumball_sm.state,
-                                 GumballStateMachine.crank_turned)
+# Each crank sequence is an independent case on a fresh fixture, so the
+# runner (or xdist) can schedule them separately: partial turns leave
+# the machine in crank_turned, the full 360 drops the gumball
+@pytest.mark.parametrize("degrees,expected", (
+    ((90,), 'crank_turned'),
+    ((90, 180), 'crank_turned'),
+    ((90, 180, 270), 'crank_turned'),
+    ((90, 180, 270, 360), 'gumball_dispensed'),
+))
+def test_crank_sequence(gumball, gumball_cls, degrees, expected):
+    sm, hw = gumball
+    _insert_coin(sm, hw)
 
-        # When the crank has spun around 360 degrees, the gumball will drop
-        self.assertEqual(self.gumball_sm.state,
-                         GumballStateMachine.gumball_dispensed)
+    for degree in degrees:
+        hw.turn_crank(degree)
+        sm.cycle()
 
-        self.gumball_sm.cycle()
+    assert sm.state is getattr(gumball_cls, expected)
 
-        self.assertEqual(self.gumball_sm.state,
-                         GumballStateMachine.crank_returned)
 
-        # No further advancement possible as state 'crank_returned' is final,
-        # so .cycle() will return False
-        self.assertFalse(self.gumball_sm.cycle())
+def test_dispense_completes(gumball, gumball_cls):
+    sm, hw = gumball
+    _insert_coin(sm, hw)
+
+    # When the crank has spun around 360 degrees, the gumball will
+    # drop: one cycle notices the turning crank, the next dispenses
+    hw.turn_crank(360)
+    sm.cycle()
+    sm.cycle()
+    assert sm.state is gumball_cls.gumball_dispensed
+
+    sm.cycle()
+
+    assert sm.state is gumball_cls.crank_returned
+
+    # No further advancement possible as state 'crank_returned' is final,
+    # so .cycle() will return False
+    assert sm.cycle() is False
 
 
 ######################################################################